@@ -0,0 +1,28 @@
+"""
+Custom authentication classes for the APIs
+"""
+from django.core.cache import cache
+
+from rest_framework.authentication import TokenAuthentication
+
+TOKEN_CACHE_TIMEOUT = 60
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """ Token authentication with a short-lived user cache
+
+    Caching the token lookup saves the token and user queries that
+    every authenticated request would otherwise issue. Deleted users
+    or tokens stay valid for at most TOKEN_CACHE_TIMEOUT seconds.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = f'auth-token:{key}'
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        user, token = super().authenticate_credentials(key)
+        cache.set(cache_key, (user, token), TOKEN_CACHE_TIMEOUT)
+
+        return user, token
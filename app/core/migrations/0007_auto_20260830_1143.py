@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-08-30 08:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_auto_20230729_0958'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['user', '-name'], name='core_ingred_user_id_344ab4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['user', '-id'], name='core_recipe_user_id_98373e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', '-name'], name='core_tag_user_id_0e0962_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.25 on 2026-08-30 08:16
+
+from django.db import migrations, models
+
+
+def backfill_names(apps, schema_editor):
+    """ Populate the denormalized name lists for existing recipes """
+    Recipe = apps.get_model('core', 'Recipe')
+    for recipe in Recipe.objects.all().iterator():
+        recipe.tag_names = list(
+            recipe.tags.values_list('name', flat=True)
+        )
+        recipe.ingredient_names = list(
+            recipe.ingredients.values_list('name', flat=True)
+        )
+        recipe.save(update_fields=['tag_names', 'ingredient_names'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_auto_20260830_1143'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='ingredient_names',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='tag_names',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(backfill_names, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,11 @@
 """
 Database Models
 """
-import os
 import uuid
 
 from django.db import models
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
 from django.contrib.auth.models import (
     PermissionsMixin,
     BaseUserManager,
@@ -15,10 +16,9 @@ from django.conf import settings
 
 def recipe_image_file_path(instance, filename: str):
     """ Generate file path for new recipe image"""
-    ext = filename.split('.')[-1]
-    filename = f'{uuid.uuid4()}.{ext}'
+    ext = filename.rpartition('.')[2]
 
-    return os.path.join('uploads/recipe/', filename)
+    return f'uploads/recipe/{uuid.uuid4().hex}.{ext}'
 
 
 class UserManager(BaseUserManager):
@@ -65,6 +65,10 @@ class Tag(models.Model):
         on_delete=models.CASCADE
     )
 
+    class Meta:
+        # Matches the list query: filter by user, order by -name.
+        indexes = [models.Index(fields=['user', '-name'])]
+
     def __str__(self):
         return self.name
 
@@ -77,6 +81,10 @@ class Ingredient(models.Model):
         on_delete=models.CASCADE
     )
 
+    class Meta:
+        # Matches the list query: filter by user, order by -name.
+        indexes = [models.Index(fields=['user', '-name'])]
+
     def __str__(self):
         return self.name
 
@@ -95,6 +103,38 @@ class Recipe(models.Model):
     ingredients = models.ManyToManyField('Ingredient')
     tags = models.ManyToManyField('Tag')
     image = models.ImageField(null=True, upload_to=recipe_image_file_path)
+    # Denormalized copies of the related names, kept in step by the
+    # m2m_changed receiver below so list reads skip the M2M tables.
+    tag_names = models.JSONField(default=list, blank=True)
+    ingredient_names = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        # Matches the list query: filter by user, order by -id.
+        indexes = [models.Index(fields=['user', '-id'])]
 
     def __str__(self):
         return self.title
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def sync_recipe_attr_names(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    """ Keep the denormalized name lists in step with the M2M rows """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        recipes = Recipe.objects.filter(pk__in=pk_set or ())
+    else:
+        recipes = [instance]
+
+    if sender is Recipe.tags.through:
+        relation, field = 'tags', 'tag_names'
+    else:
+        relation, field = 'ingredients', 'ingredient_names'
+
+    for recipe in recipes:
+        names = list(getattr(recipe, relation).values_list('name', flat=True))
+        setattr(recipe, field, names)
+        recipe.save(update_fields=[field])
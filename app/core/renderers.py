@@ -0,0 +1,19 @@
+"""
+Custom renderers for the APIs
+"""
+import orjson
+
+from rest_framework.renderers import BaseRenderer
+
+
+class ORJSONRenderer(BaseRenderer):
+    """ JSON renderer backed by orjson for faster encoding """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        return orjson.dumps(data, default=str)
@@ -0,0 +1,53 @@
+"""
+Tests for the cached token authentication
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from core.authentication import CachedTokenAuthentication
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'cached-token-auth-tests',
+    },
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CachedTokenAuthenticationTests(TestCase):
+    """ Test the cached token authentication backend """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            'test@gmail.com',
+            'testpass'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.auth = CachedTokenAuthentication()
+
+    def test_repeated_lookup_served_from_cache(self):
+        """ Test a second lookup of the same token issues no queries """
+        user, token = self.auth.authenticate_credentials(self.token.key)
+
+        with self.assertNumQueries(0):
+            cached_user, cached_token = self.auth.authenticate_credentials(
+                self.token.key
+            )
+
+        self.assertEqual(cached_user, user)
+        self.assertEqual(cached_token, token)
+
+    def test_failed_authentication_not_cached(self):
+        """ Test an invalid token is rejected and never cached """
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials('bad-key')
+
+        self.assertIsNone(cache.get('auth-token:bad-key'))
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials('bad-key')
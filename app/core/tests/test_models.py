@@ -2,17 +2,28 @@
 Tests for models
 """
 from decimal import Decimal
+from functools import lru_cache
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.test import TestCase
 
 from core import models
 
 
+@lru_cache(maxsize=None)
+def _hashed_password(raw_password):
+    """ Hash each distinct test password once per process """
+    return make_password(raw_password)
+
+
 def sample_user(email='test@gmail.com', password='testpass'):
     """ Create a sample user """
-    return get_user_model().objects.create_user(email, password)
+    return get_user_model().objects.create(
+        email=email,
+        password=_hashed_password(password),
+    )
 
 
 class ModelTests(TestCase):
@@ -89,8 +100,8 @@ class ModelTests(TestCase):
     @patch('uuid.uuid4')
     def test_recipe_file_name_uuid(self, mock_uuid):
         """ Test that image is saved in the correct location """
-        uuid = 'test-uuid'
-        mock_uuid.return_value = uuid
+        uuid = 'testuuid'
+        mock_uuid.return_value.hex = uuid
         file_path = models.recipe_image_file_path(None, 'myimage.jpg')
 
         exp_path = f'uploads/recipe/{uuid}.jpg'
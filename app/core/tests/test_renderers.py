@@ -0,0 +1,32 @@
+"""
+Tests for custom renderers
+"""
+import json
+from decimal import Decimal
+
+from django.test import TestCase
+
+from core.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTests(TestCase):
+
+    def setUp(self) -> None:
+        self.renderer = ORJSONRenderer()
+
+    def test_render_list_of_dicts(self):
+        """ Test rendering a list payload produces valid JSON bytes """
+        data = [{'id': 1, 'title': 'Sample Recipe', 'tags': ['Vegan']}]
+        rendered = self.renderer.render(data)
+
+        self.assertEqual(json.loads(rendered), data)
+
+    def test_render_decimal_falls_back_to_str(self):
+        """ Test non-native types are rendered through str """
+        rendered = self.renderer.render({'price': Decimal('5.25')})
+
+        self.assertEqual(json.loads(rendered), {'price': '5.25'})
+
+    def test_render_none_returns_empty(self):
+        """ Test rendering None produces an empty body """
+        self.assertEqual(self.renderer.render(None), b'')
@@ -1,12 +1,35 @@
 """
 Serializers for Recipe APIs
 """
+import copy
+
 from rest_framework import serializers
 
 from core.models import Tag, Ingredient, Recipe
 
 
-class TagSerializer(serializers.ModelSerializer):
+class CachedFieldsMixin:
+    """ Build the serializer fields once per class instead of per instance """
+
+    def get_fields(self):
+        cls = self.__class__
+        if '_fields_cache' not in cls.__dict__:
+            cls._fields_cache = super().get_fields()
+
+        return {
+            name: copy.copy(field)
+            for name, field in cls._fields_cache.items()
+        }
+
+
+class PlainDictListSerializer(serializers.ListSerializer):
+    """ List serializer that emits plain dicts instead of OrderedDicts """
+
+    def to_representation(self, data):
+        return [dict(item) for item in super().to_representation(data)]
+
+
+class TagSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """ Serializer for tag objects """
 
     class Meta:
@@ -15,7 +38,7 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class IngredientSerializer(serializers.ModelSerializer):
+class IngredientSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """ Serializer for ingredient objects """
 
     class Meta:
@@ -24,7 +47,7 @@ class IngredientSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """ Serializer for recipe objects """
     tags = TagSerializer(many=True, required=False)
     ingredients = IngredientSerializer(many=True, required=False)
@@ -36,34 +59,29 @@ class RecipeSerializer(serializers.ModelSerializer):
             'tags'
         ]
         read_only_fields = ('id',)
+        list_serializer_class = PlainDictListSerializer
 
-    def _get_or_create_tags(self, tags, recipe):
-        """ Handle getting or creating tags as needed """
+    def _sync_attrs(self, model, attrs, related_manager):
+        """ Sync a recipe M2M relation in a constant number of queries """
         auth_user = self.context['request'].user
-        for tag in tags:
-            tag_obj, created = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag,
+        names = {attr['name'] for attr in attrs}
+        existing = model.objects.filter(user=auth_user, name__in=names)
+        missing = names.difference(obj.name for obj in existing)
+        if missing:
+            model.objects.bulk_create(
+                [model(user=auth_user, name=name) for name in missing]
             )
-            recipe.tags.add(tag_obj)
+            existing = model.objects.filter(user=auth_user, name__in=names)
 
-    def _get_or_create_ingredients(self, ingredients, recipe):
-        """ Handle getting or creating ingredients as needed """
-        auth_user = self.context['request'].user
-        for ingredient in ingredients:
-            ingredient_obj, created = Ingredient.objects.get_or_create(
-                user=auth_user,
-                **ingredient,
-            )
-            recipe.ingredients.add(ingredient_obj)
+        related_manager.set(existing)
 
     def create(self, validated_data):
         """ Create a recipe """
         tags = validated_data.pop('tags', [])
         ingredients = validated_data.pop('ingredients', [])
         recipe = Recipe.objects.create(**validated_data)
-        self._get_or_create_tags(tags, recipe)
-        self._get_or_create_ingredients(ingredients, recipe)
+        self._sync_attrs(Tag, tags, recipe.tags)
+        self._sync_attrs(Ingredient, ingredients, recipe.ingredients)
 
         return recipe
 
@@ -72,11 +90,9 @@ class RecipeSerializer(serializers.ModelSerializer):
         tags = validated_data.pop('tags', None)
         ingredients = validated_data.pop('ingredients', None)
         if tags is not None:
-            instance.tags.clear()
-            self._get_or_create_tags(tags, instance)
+            self._sync_attrs(Tag, tags, instance.tags)
         if ingredients is not None:
-            instance.ingredients.clear()
-            self._get_or_create_ingredients(ingredients, instance)
+            self._sync_attrs(Ingredient, ingredients, instance.ingredients)
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
@@ -85,6 +101,24 @@ class RecipeSerializer(serializers.ModelSerializer):
         return instance
 
 
+class RecipeListSerializer(CachedFieldsMixin, serializers.ModelSerializer):
+    """ Lightweight serializer for the recipe list view """
+    tags = serializers.JSONField(source='tag_names', read_only=True)
+    ingredients = serializers.JSONField(
+        source='ingredient_names',
+        read_only=True,
+    )
+
+    class Meta:
+        model = Recipe
+        fields = [
+            'id', 'title', 'time_minutes', 'price', 'link', 'ingredients',
+            'tags'
+        ]
+        read_only_fields = ('id',)
+        list_serializer_class = PlainDictListSerializer
+
+
 class RecipeDetailSerializer(RecipeSerializer):
     """ Serializer for the recipe detail view """
 
@@ -0,0 +1,37 @@
+"""
+Shared fixtures for the recipe API tests
+"""
+import copy
+from functools import lru_cache
+from http.cookies import SimpleCookie
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from rest_framework.test import APIClient
+
+# Constructing APIClient is surprisingly heavy; build one template and
+# hand each test a shallow copy instead.
+_TEMPLATE_CLIENT = APIClient()
+
+
+def sample_client():
+    """ Clone the template client instead of building one per test """
+    client = copy.copy(_TEMPLATE_CLIENT)
+    # The handler and cookie jar are mutable and must stay per-test,
+    # otherwise forced authentication leaks between test cases.
+    client.handler = copy.copy(_TEMPLATE_CLIENT.handler)
+    client.cookies = SimpleCookie()
+    return client
+
+
+@lru_cache(maxsize=None)
+def _hashed_password(raw_password):
+    """ Hash each distinct test password once per process """
+    return make_password(raw_password)
+
+
+def sample_user(**params):
+    """ Create and return a new user """
+    params['password'] = _hashed_password(params.get('password', 'testpass'))
+    return get_user_model().objects.create(**params)
@@ -1,13 +1,12 @@
-from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.test import TestCase
 
 from rest_framework import status
-from rest_framework.test import APIClient
 
 from core.models import Ingredient, Recipe
 
 from recipe.serializers import IngredientSerializer
+from recipe.tests.helpers import sample_client, sample_user
 
 
 INGREDIENTS_URL = reverse('recipe:ingredient-list')
@@ -17,7 +16,7 @@ class PublicIngredientsAPITests(TestCase):
     """ Test the publicly available ingredients API """
 
     def setUp(self) -> None:
-        self.client = APIClient()
+        self.client = sample_client()
 
     def test_login_required(self):
         """ Test that login is required for retrieving ingredients """
@@ -29,12 +28,12 @@ class PublicIngredientsAPITests(TestCase):
 class PrivateIngredientsAPITests(TestCase):
     """ Test the authorized user ingredients API """
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = sample_user(email='test@gmail.com', password='testpass')
+
     def setUp(self) -> None:
-        self.user = get_user_model().objects.create_user(
-            'test@gmail.com',
-            'testpass'
-        )
-        self.client = APIClient()
+        self.client = sample_client()
         self.client.force_authenticate(self.user)
 
     def test_retrieve_ingredients_list(self):
@@ -47,14 +46,11 @@ class PrivateIngredientsAPITests(TestCase):
         ingredients = Ingredient.objects.all().order_by('-name')
         serializer = IngredientSerializer(ingredients, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_ingredients_limited_to_user(self):
         """ Test that ingredients returned are only for authenticated user """
-        user2 = get_user_model().objects.create_user(
-            'test2@gmail.com',
-            'testpass'
-        )
+        user2 = sample_user(email='test2@gmail.com', password='testpass')
 
         Ingredient.objects.create(user=user2, name='Salt')
         ingredient = Ingredient.objects.create(user=self.user, name='Vinegar')
@@ -62,8 +58,8 @@ class PrivateIngredientsAPITests(TestCase):
         res = self.client.get(INGREDIENTS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], ingredient.name)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], ingredient.name)
 
     def test_create_ingredient_successful(self):
         """ Test creating a new ingredient """
@@ -97,11 +93,13 @@ class PrivateIngredientsAPITests(TestCase):
 
         res = self.client.get(INGREDIENTS_URL, {'assigned_only': 1})
 
-        serializer1 = IngredientSerializer(ingredient1)
-        serializer2 = IngredientSerializer(ingredient2)
+        serialized = IngredientSerializer(
+            [ingredient1, ingredient2],
+            many=True
+        ).data
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serialized[0], res.data['results'])
+        self.assertNotIn(serialized[1], res.data['results'])
 
     def test_retrieve_ingredients_assigned_unique(self):
         """ Test filtering ingredients by assigned returns unique items """
@@ -124,4 +122,4 @@ class PrivateIngredientsAPITests(TestCase):
 
         res = self.client.get(INGREDIENTS_URL, {'assigned_only': 1})
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
@@ -5,18 +5,22 @@ Tests for recipe APIs.
 # import os
 #
 # from PIL import Image
+import csv
+import io
 from decimal import Decimal
 
-from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.urls import reverse
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from rest_framework import status
-from rest_framework.test import APIClient
 
 from core.models import Recipe, Tag, Ingredient
 
-from recipe.serializers import RecipeSerializer, RecipeDetailSerializer
+from recipe.serializers import RecipeListSerializer, RecipeDetailSerializer
+from recipe.tests.helpers import sample_client, sample_user
 
 
 RECIPES_URL = reverse('recipe:recipe-list')
@@ -37,11 +41,33 @@ def sample_tag(user, name='Main Course'):
     return Tag.objects.create(user=user, name=name)
 
 
+def sample_tags(user, names):
+    """ Create and return sample tags with a single bulk INSERT """
+    Tag.objects.bulk_create([Tag(user=user, name=name) for name in names])
+    by_name = {
+        tag.name: tag
+        for tag in Tag.objects.filter(user=user, name__in=names)
+    }
+    return [by_name[name] for name in names]
+
+
 def sample_ingredient(user, name='Cinnamon'):
     """ Create and return a sample ingredient """
     return Ingredient.objects.create(user=user, name=name)
 
 
+def sample_ingredients(user, names):
+    """ Create and return sample ingredients with a single bulk INSERT """
+    Ingredient.objects.bulk_create(
+        [Ingredient(user=user, name=name) for name in names]
+    )
+    by_name = {
+        ingredient.name: ingredient
+        for ingredient in Ingredient.objects.filter(user=user, name__in=names)
+    }
+    return [by_name[name] for name in names]
+
+
 def sample_recipe(user, **params):
     """ Create and return a sample recipe """
     defaults = {
@@ -57,16 +83,65 @@ def sample_recipe(user, **params):
     return recipe
 
 
-def sample_user(**params):
-    """ Create and return a new user """
-    return get_user_model().objects.create_user(**params)
+def _copy_recipes(user, titles, defaults):
+    """ Load recipe rows with a single Postgres COPY
+
+    The column list must name every NOT NULL column without a database
+    default (Django keeps field defaults in Python only), so keep it in
+    step with schema changes to the Recipe model.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for title in titles:
+        writer.writerow([
+            user.id,
+            title,
+            defaults['time_minutes'],
+            defaults['price'],
+            defaults['description'],
+            defaults['link'],
+            '[]',
+            '[]',
+        ])
+    buffer.seek(0)
+
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            'COPY core_recipe (user_id, title, time_minutes, price,'
+            ' description, link, tag_names, ingredient_names)'
+            ' FROM STDIN WITH (FORMAT csv)',
+            buffer,
+        )
+
+
+def sample_recipes(user, titles, **params):
+    """ Create and return sample recipes with a single bulk INSERT """
+    defaults = {
+        'time_minutes': 10,
+        'price': Decimal(5.25),
+        'description': 'Sample Recipe Description',
+        'link': 'https://example.com/recipe.pdf',
+    }
+    defaults.update(params)
+
+    if connection.vendor == 'postgresql' and len(titles) > 3:
+        _copy_recipes(user, titles, defaults)
+    else:
+        Recipe.objects.bulk_create(
+            [Recipe(user=user, title=title, **defaults) for title in titles]
+        )
+    by_title = {
+        recipe.title: recipe
+        for recipe in Recipe.objects.filter(user=user, title__in=titles)
+    }
+    return [by_title[title] for title in titles]
 
 
 class PublicRecipesAPITests(TestCase):
     """ Test the publicly available recipes API """
 
     def setUp(self) -> None:
-        self.client = APIClient()
+        self.client = sample_client()
 
     def test_login_required(self):
         """ Test that login is required for retrieving recipes """
@@ -78,9 +153,12 @@ class PublicRecipesAPITests(TestCase):
 class PrivateRecipesAPITests(TestCase):
     """ Test the authorized user recipes API """
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = sample_user(email='test@gmail.com', password='testpass')
+
     def setUp(self) -> None:
-        self.user = sample_user(email='test@gmail.com', password='testpass')
-        self.client = APIClient()
+        self.client = sample_client()
         self.client.force_authenticate(self.user)
 
     def test_retrieve_recipes(self):
@@ -91,9 +169,28 @@ class PrivateRecipesAPITests(TestCase):
         res = self.client.get(RECIPES_URL)
 
         recipes = Recipe.objects.all().order_by('-id')
-        serializer = RecipeSerializer(recipes, many=True)
+        serializer = RecipeListSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
+
+    def test_retrieve_recipes_query_count_constant(self):
+        """ Test the list query count does not grow with list size """
+        recipe1, recipe2 = sample_recipes(user=self.user, titles=['R1', 'R2'])
+        recipe1.tags.add(sample_tag(user=self.user))
+        recipe2.ingredients.add(sample_ingredient(user=self.user))
+
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get(RECIPES_URL)
+
+        sample_recipes(user=self.user, titles=['R3', 'R4', 'R5', 'R6'])
+
+        with CaptureQueriesContext(connection) as larger:
+            self.client.get(RECIPES_URL)
+
+        self.assertEqual(
+            len(larger.captured_queries),
+            len(baseline.captured_queries),
+        )
 
     def test_recipes_limited_to_user(self):
         """ Test that recipes returned are for the authenticated user """
@@ -104,9 +201,9 @@ class PrivateRecipesAPITests(TestCase):
         res = self.client.get(RECIPES_URL)
 
         recipes = Recipe.objects.filter(user=self.user).order_by('-id')
-        serializer = RecipeSerializer(recipes, many=True)
+        serializer = RecipeListSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_view_recipe_detail(self):
         """ Test viewing a recipe detail """
@@ -264,11 +361,15 @@ class PrivateRecipesAPITests(TestCase):
 
     def test_filter_recipes_by_tags(self):
         """ Test returning recipes with specific tags """
-        recipe1 = sample_recipe(user=self.user, title='Thai Vegetable Curry')
-        recipe2 = sample_recipe(user=self.user, title='Aubergine with Tahini')
-        recipe3 = sample_recipe(user=self.user, title='Fish and Chips')
-        tag1 = sample_tag(user=self.user, name='Vegan')
-        tag2 = sample_tag(user=self.user, name='Vegetarian')
+        recipe1, recipe2, recipe3 = sample_recipes(
+            user=self.user,
+            titles=[
+                'Thai Vegetable Curry',
+                'Aubergine with Tahini',
+                'Fish and Chips',
+            ],
+        )
+        tag1, tag2 = sample_tags(user=self.user, names=['Vegan', 'Vegetarian'])
         recipe1.tags.add(tag1)
         recipe2.tags.add(tag2)
 
@@ -277,20 +378,28 @@ class PrivateRecipesAPITests(TestCase):
             {'tags': f'{tag1.id},{tag2.id}'}
         )
 
-        serializer1 = RecipeSerializer(recipe1)
-        serializer2 = RecipeSerializer(recipe2)
-        serializer3 = RecipeSerializer(recipe3)
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        serialized = RecipeListSerializer(
+            [recipe1, recipe2, recipe3],
+            many=True
+        ).data
+        self.assertIn(serialized[0], res.data['results'])
+        self.assertIn(serialized[1], res.data['results'])
+        self.assertNotIn(serialized[2], res.data['results'])
 
     def test_filter_recipes_by_ingredients(self):
         """ Test returning recipes with specific ingredients """
-        recipe1 = sample_recipe(user=self.user, title='Posh Beans on Toast')
-        recipe2 = sample_recipe(user=self.user, title='Chicken Cacciatore')
-        recipe3 = sample_recipe(user=self.user, title='Steak and Mushrooms')
-        ingredient1 = sample_ingredient(user=self.user, name='Feta Cheese')
-        ingredient2 = sample_ingredient(user=self.user, name='Chicken')
+        recipe1, recipe2, recipe3 = sample_recipes(
+            user=self.user,
+            titles=[
+                'Posh Beans on Toast',
+                'Chicken Cacciatore',
+                'Steak and Mushrooms',
+            ],
+        )
+        ingredient1, ingredient2 = sample_ingredients(
+            user=self.user,
+            names=['Feta Cheese', 'Chicken'],
+        )
         recipe1.ingredients.add(ingredient1)
         recipe2.ingredients.add(ingredient2)
 
@@ -299,20 +408,24 @@ class PrivateRecipesAPITests(TestCase):
             {'ingredients': f'{ingredient1.id},{ingredient2.id}'}
         )
 
-        serializer1 = RecipeSerializer(recipe1)
-        serializer2 = RecipeSerializer(recipe2)
-        serializer3 = RecipeSerializer(recipe3)
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        serialized = RecipeListSerializer(
+            [recipe1, recipe2, recipe3],
+            many=True
+        ).data
+        self.assertIn(serialized[0], res.data['results'])
+        self.assertIn(serialized[1], res.data['results'])
+        self.assertNotIn(serialized[2], res.data['results'])
 
 
 class RecipeImageUploadTests(TestCase):
     """ Tests for uploading images """
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = sample_user(email='test@gmail.com', password='testpass')
+
     def setUp(self) -> None:
-        self.client = APIClient()
-        self.user = sample_user(email='test@gmail.com', password='testpass')
+        self.client = sample_client()
         self.client.force_authenticate(self.user)
         self.recipe = sample_recipe(user=self.user)
 
@@ -339,3 +452,15 @@ class RecipeImageUploadTests(TestCase):
         res = self.client.post(url, {'image': 'notimage'}, format='multipart')
 
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_upload_known_non_image_rejected(self):
+        """ Test a file with a known non-image signature is rejected early """
+        url = image_upload_url(self.recipe.id)
+        fake_image = SimpleUploadedFile(
+            'notimage.jpg',
+            b'%PDF-1.4 not an image',
+            content_type='image/jpeg',
+        )
+        res = self.client.post(url, {'image': fake_image}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,22 +1,30 @@
-from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.urls import reverse
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from rest_framework import status
-from rest_framework.test import APIClient
 
 from core.models import Tag, Recipe
 
 from recipe.serializers import TagSerializer
+from recipe.tests.helpers import sample_client, sample_user
 
 TAGS_URL = reverse('recipe:tag-list')
 
+# The test settings use DummyCache; the ETag tests need a real backend.
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tags-etag-tests',
+    },
+}
+
 
 class PublicTagsAPITests(TestCase):
     """ Test the publicly available tags API """
 
     def setUp(self) -> None:
-        self.client = APIClient()
+        self.client = sample_client()
 
     def test_login_required(self):
         """ test that login is required for retrieving tags """
@@ -28,12 +36,12 @@ class PublicTagsAPITests(TestCase):
 class PrivateTagsAPITests(TestCase):
     """ Test the authorized user tags API """
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = sample_user(email='test@gmail.com', password='testpass')
+
     def setUp(self) -> None:
-        self.user = get_user_model().objects.create_user(
-            'test@gmail.com',
-            'testpass'
-        )
-        self.client = APIClient()
+        self.client = sample_client()
         self.client.force_authenticate(self.user)
 
     def test_retrieve_tags(self):
@@ -46,22 +54,43 @@ class PrivateTagsAPITests(TestCase):
         tags = Tag.objects.all().order_by('-name')
         serializer = TagSerializer(tags, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_tags_limited_to_user(self):
         """ Test that tags returned are for the authenticated user """
-        user2 = get_user_model().objects.create_user(
-            'test2@gmail.com',
-            'testpass'
-        )
+        user2 = sample_user(email='test2@gmail.com', password='testpass')
         Tag.objects.create(name='Fruity', user=user2)
         tag = Tag.objects.create(name='Vegan', user=self.user)
 
         res = self.client.get(TAGS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], tag.name)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], tag.name)
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_retrieve_tags_not_modified(self):
+        """ Test a matching If-None-Match gets 304 without a body """
+        cache.clear()
+        Tag.objects.create(name='Vegan', user=self.user)
+
+        first = self.client.get(TAGS_URL)
+        res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_etag_rotates_after_write(self):
+        """ Test a write rotates the ETag so conditional GETs see it """
+        cache.clear()
+        Tag.objects.create(name='Vegan', user=self.user)
+
+        first = self.client.get(TAGS_URL)
+        self.client.post(TAGS_URL, {'name': 'Dessert'})
+        res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], first['ETag'])
 
     def test_create_tag_successful(self):
         """ Test creating a new tag """
@@ -95,10 +124,9 @@ class PrivateTagsAPITests(TestCase):
 
         res = self.client.get(TAGS_URL, {'assigned_only': 1})
 
-        serializer1 = TagSerializer(tag1)
-        serializer2 = TagSerializer(tag2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        serialized = TagSerializer([tag1, tag2], many=True).data
+        self.assertIn(serialized[0], res.data['results'])
+        self.assertNotIn(serialized[1], res.data['results'])
 
     def test_retrieve_tags_assigned_unique(self):
         """ Test filtering tags by assigned return unique items """
@@ -121,4 +149,4 @@ class PrivateTagsAPITests(TestCase):
 
         res = self.client.get(TAGS_URL, {'assigned_only': 1})
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
@@ -1,38 +1,130 @@
 """
 Views for the recipe APIs
 """
+import time
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
 from rest_framework.mixins import ListModelMixin, CreateModelMixin
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
 
+from core.authentication import CachedTokenAuthentication
 from core.models import Tag, Ingredient, Recipe
 
 from recipe import serializers
 
 
+# Magic bytes of common non-image uploads. Only these are rejected
+# before Pillow runs; unrecognized headers fall through to full
+# serializer validation, so every format Pillow accepts still works.
+NON_IMAGE_SIGNATURES = (
+    b'%PDF',  # PDF
+    b'PK\x03\x04',  # zip (also docx/xlsx/odt)
+    b'\x1f\x8b',  # gzip
+    b'Rar!',  # RAR
+    b'<!DO',  # HTML
+    b'<htm',  # HTML
+    b'ID3',  # MP3
+    b'OggS',  # Ogg audio/video
+    b'\x7fELF',  # ELF binary
+    b'MZ',  # Windows executable
+)
+
+TRUTHY_PARAMS = frozenset({'1', 'true', 'yes'})
+
+
+def _bump_cache_version(key):
+    """ Invalidate version-keyed cache entries in O(1) """
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+class RecipeAttrPagination(CursorPagination):
+    """ Cursor pagination matching the (user, -name) index """
+    page_size = 50
+    ordering = ('-name', '-id')
+
+
+class RecipePagination(CursorPagination):
+    """ Cursor pagination matching the (user, -id) index """
+    page_size = 50
+    ordering = '-id'
+
+
 class BaseRecipeAttrViewSet(GenericViewSet, ListModelMixin, CreateModelMixin):
     """ Base view set for user owned recipe attributes """
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated, )
+    pagination_class = RecipeAttrPagination
+    etag_timeout = 60
+
+    def _version_key(self):
+        model = self.queryset.model._meta.model_name
+        return f'{model}s:version:{self.request.user.id}'
+
+    def _etag(self):
+        """ ETag derived from the user's write-version counter
+
+        The counter is seeded from the clock and expires after
+        etag_timeout seconds, so a counter lost to eviction, a restart
+        or another worker can serve a stale 304 for no longer than the
+        recipe list cache serves stale bodies.
+        """
+        return '"{}"'.format(cache.get_or_set(
+            self._version_key(), time.time_ns, timeout=self.etag_timeout
+        ))
 
     def get_queryset(self):
         """ Return objects for the current authenticated user only """
-        queryset = self.queryset.filter(user=self.request.user)
-        assigned_only = bool(
-            int(self.request.query_params.get('assigned_only', 0))
+        request = self.request
+        # Start from the manager rather than cloning the shared
+        # class-level queryset; self.queryset stays for router/schema
+        # introspection only.
+        queryset = self.queryset.model.objects.filter(user=request.user)
+        if self.action != 'list':
+            return queryset
+
+        assigned_only = (
+            request.query_params.get('assigned_only', '').lower()
+            in TRUTHY_PARAMS
         )
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
+            # Only the recipe join can produce duplicates, so DISTINCT
+            # stays off the common path.
+            queryset = queryset.filter(recipe__isnull=False).distinct()
 
-        return queryset.order_by('-name').distinct()
+        return queryset.order_by('-name')
+
+    def list(self, request, *args, **kwargs):
+        """ Render id/name rows straight from the database
+
+        The fields are trivial, so .values() skips model and serializer
+        construction entirely.
+        """
+        etag = self._etag()
+        if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values('id', 'name')
+        page = self.paginate_queryset(rows)
+        response = self.get_paginated_response(page)
+        response['ETag'] = etag
+
+        return response
 
     def perform_create(self, serializer):
         """ Create a new object for the current authenticated user only """
         serializer.save(user=self.request.user)
+        _bump_cache_version(self._version_key())
 
 
 class TagViewSet(BaseRecipeAttrViewSet):
@@ -51,58 +143,139 @@ class RecipeViewSet(ModelViewSet):
     """ View for manage recipe APIs """
     serializer_class = serializers.RecipeDetailSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = RecipePagination
+    list_cache_timeout = 60
+    _ACTION_SERIALIZERS = {
+        'list': serializers.RecipeListSerializer,
+        'upload_image': serializers.RecipeImageSerializer,
+    }
+
+    @staticmethod
+    def _list_cache_version(user_id):
+        """ Per-user cache version, bumped on every write """
+        key = f'recipes:version:{user_id}'
+        return key, cache.get_or_set(key, 1, timeout=None)
+
+    @staticmethod
+    def _invalidate_list_cache(user_id):
+        """ Drop the user's cached list responses by bumping the version """
+        # Recipe writes also change which tags/ingredients count as
+        # assigned, so their list ETags rotate along with the recipes.
+        for prefix in ('recipes', 'tags', 'ingredients'):
+            _bump_cache_version(f'{prefix}:version:{user_id}')
 
     @staticmethod
     def _params_to_ints(qs: str):
-        """ Convert a list of string IDs to a list of integers """
-        return [int(str_id) for str_id in qs.split(',')]
+        """ Convert a comma-separated list of string IDs to integers """
+        return tuple(map(int, qs.split(',')))
 
     def get_queryset(self):
         """ Retrieve the recipes for the authenticated user only """
-        queryset = self.queryset.filter(user=self.request.user)
-        tags = self.request.query_params.get('tags')
-        ingredients = self.request.query_params.get('ingredients')
+        request = self.request
+        queryset = Recipe.objects.filter(user=request.user)
+        if self.action == 'upload_image':
+            # The image serializer only touches these two columns.
+            return queryset.only('id', 'image')
+        if self.action not in ('list', 'retrieve'):
+            # Write actions only do a single-row pk lookup, which needs
+            # neither prefetching nor ordering.
+            return queryset
+
+        if self.action == 'retrieve':
+            return queryset.prefetch_related(
+                Prefetch('tags', queryset=Tag.objects.only('id', 'name')),
+                Prefetch(
+                    'ingredients',
+                    queryset=Ingredient.objects.only('id', 'name'),
+                ),
+            )
+
+        # The list serializer reads the denormalized name columns, so
+        # no prefetch is needed: the whole page is one SELECT.
+        queryset = queryset.only(
+            'id', 'title', 'time_minutes', 'price', 'link', 'user',
+            'tag_names', 'ingredient_names',
+        )
+        tags = request.query_params.get('tags')
+        ingredients = request.query_params.get('ingredients')
         if tags:
             tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            queryset = queryset.filter(id__in=Recipe.objects.filter(
+                tags__id__in=tag_ids
+            ).values('id'))
         if ingredients:
             ingredient_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
+            queryset = queryset.filter(id__in=Recipe.objects.filter(
+                ingredients__id__in=ingredient_ids
+            ).values('id'))
 
         return queryset.order_by('-id')
 
     def get_serializer_class(self):
         """ Return appropriate serializer class """
-        if self.action == 'list':
-            return serializers.RecipeSerializer
-        elif self.action == 'upload_image':
-            return serializers.RecipeImageSerializer
+        return self._ACTION_SERIALIZERS.get(self.action, self.serializer_class)
 
-        return self.serializer_class
+    def list(self, request, *args, **kwargs):
+        """ Return the recipe list, cached per user and filter params """
+        user_id = request.user.id
+        version_key, version = self._list_cache_version(user_id)
+        key = 'recipes:{}:{}:{}:{}'.format(
+            user_id,
+            request.query_params.get('tags', ''),
+            request.query_params.get('ingredients', ''),
+            request.query_params.get('cursor', ''),
+        )
+        data = cache.get(key, version=version)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, self.list_cache_timeout, version=version)
+
+        return Response(data)
 
     def perform_create(self, serializer):
         """ Create a new recipe for the authenticated user only """
-        serializer.save(user=self.request.user)
+        user = self.request.user
+        serializer.save(user=user)
+        self._invalidate_list_cache(user.id)
+
+    def perform_update(self, serializer):
+        """ Update a recipe and drop the stale cached lists """
+        serializer.save()
+        self._invalidate_list_cache(self.request.user.id)
+
+    def perform_destroy(self, instance):
+        """ Delete a recipe and drop the stale cached lists """
+        instance.delete()
+        self._invalidate_list_cache(self.request.user.id)
+
+    @staticmethod
+    def _is_known_non_image(upload):
+        """ Cheap magic-byte reject before full Pillow verification """
+        header = upload.read(8)
+        upload.seek(0)
+        return header.startswith(NON_IMAGE_SIGNATURES)
 
     @action(methods=['POST'], detail=True, url_path='upload-image')
     def upload_image(self, request, pk=None):
         """ Upload an image to a recipe """
         recipe = self.get_object()
+        image = request.FILES.get('image')
+        if image is not None and self._is_known_non_image(image):
+            return Response(
+                {'image': ['Upload a valid image.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         serializer = self.get_serializer(
             recipe,
             data=request.data
         )
-
-        if serializer.is_valid():
-            serializer.save()
-            return Response(
-                serializer.data,
-                status=status.HTTP_200_OK
-            )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
 
         return Response(
-            serializer.errors,
-            status=status.HTTP_400_BAD_REQUEST
+            serializer.data,
+            status=status.HTTP_200_OK
         )